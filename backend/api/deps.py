@@ -10,15 +10,19 @@ from backend.db.sessions import AsyncSessionFactory
 logger = logging.getLogger(__name__)
 
 
-async def get_db_session() -> AsyncGenerator[AsyncSession, None]:
+async def get_read_session() -> AsyncGenerator[AsyncSession, None]:
     """
-    FastAPI dependency to create and yield a database session.
+    FastAPI dependency for read-only endpoints. The transaction is never
+    committed; it is rolled back on exit to release its snapshot.
+    Errors are translated into HTTP 500 responses.
     """
     session: AsyncSession = AsyncSessionFactory()
 
     try:
         yield session
 
+        await session.rollback()
+
     except SQLAlchemyError as sql_exc:
         logger.error(f"Database error during request: {sql_exc}", exc_info=True)
 
@@ -1,26 +1,15 @@
 import logging
-from functools import lru_cache
 from typing import List
 
-from fastapi import APIRouter, Depends, File, HTTPException, UploadFile, status
+from fastapi import APIRouter, File, HTTPException, UploadFile, status
 
 from backend.schemas.ingestion import DocumentIngestResponse
-from backend.services.document_processor import DocumentProcessorService
+from backend.services import document_processor
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
 
-@lru_cache(None)
-def get_doc_processor_service() -> DocumentProcessorService:
-    """
-    Dependency to get a singleton instance of the DocumentProcessorService.
-    This ensures the ML model is loaded only once.
-    """
-    logger.info("Initializing DocumentProcessorService singleton...")
-    return DocumentProcessorService()
-
-
 @router.post(
     "/ingest/documents",
     response_model=DocumentIngestResponse,
@@ -31,14 +20,13 @@ def get_doc_processor_service() -> DocumentProcessorService:
 )
 async def ingest_documents(
     files: List[UploadFile] = File(..., description="List of documents to upload."),
-    doc_processor: DocumentProcessorService = Depends(get_doc_processor_service),
 ):
     """
     Endpoint to upload and process multiple documents.
 
     It handles:
     - Receiving a list of files.
-    - Passing them to the DocumentProcessorService.
+    - Passing them to the document processor.
     - Returning a summary of the ingestion.
     """
     if not files:
@@ -51,7 +39,7 @@ async def ingest_documents(
     logger.info(f"Received {len(files)} files for ingestion.")
 
     try:
-        count, chunks, ids = await doc_processor.process_documents(files)
+        count, chunks, ids = await document_processor.process_documents(files)
 
         logger.info(f"Successfully ingested {count} documents as {chunks} chunks.")
 
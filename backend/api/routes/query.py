@@ -1,10 +1,18 @@
 import logging
+from typing import AsyncIterator
 
+import orjson
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from backend.api.deps import get_db_session
-from backend.schemas.query import QueryRequest, QueryResponse
+from backend.api.deps import get_read_session
+from backend.schemas.query import (
+    DocumentResult,
+    QueryRequest,
+    QueryResponse,
+    SQLResult,
+)
 from backend.services.query_engine import QueryEngineService
 
 logger = logging.getLogger(__name__)
@@ -12,7 +20,7 @@ router = APIRouter()
 
 
 def get_query_engine_service(
-    db: AsyncSession = Depends(get_db_session),
+    db: AsyncSession = Depends(get_read_session),
 ) -> QueryEngineService:
     """Dependency to create a QueryEngineService instance per request."""
     return QueryEngineService(db)
@@ -39,7 +47,9 @@ async def process_query_endpoint(
 
     try:
         response = await service.process_query(request.query)
-        return response
+
+        # Already a validated QueryResponse; skip FastAPI's re-validation
+        return ORJSONResponse(content=response.model_dump(mode="json"))
 
     except Exception as e:
         logger.error(f"Failed to process query '{request.query}': {e}", exc_info=True)
@@ -47,3 +57,53 @@ async def process_query_endpoint(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="An unexpected error occurred while processing the query.",
         )
+
+
+async def _ndjson_lines(
+    service: QueryEngineService, query: str
+) -> AsyncIterator[bytes]:
+    """Serializes each streamed part of a query as one NDJSON line."""
+    try:
+        async for part in service.stream_query(query):
+            if isinstance(part, SQLResult):
+                event = {"sql_result": part.model_dump(mode="json")}
+            elif isinstance(part, DocumentResult):
+                event = {"document_result": part.model_dump(mode="json")}
+            else:
+                event = {"response": part.model_dump(mode="json")}
+
+            yield orjson.dumps(event) + b"\n"
+
+    except Exception as e:
+        # Headers are already sent, so report the failure in the stream
+        logger.error(f"Failed to stream query '{query}': {e}", exc_info=True)
+        yield (
+            orjson.dumps(
+                {"error": "An unexpected error occurred while processing the query."}
+            )
+            + b"\n"
+        )
+
+
+@router.post(
+    "/query/stream",
+    response_class=StreamingResponse,
+    summary="Stream a Natural Language Query",
+    description="Processes a query like /query, but streams newline-delimited "
+    "JSON: each SQL or document result as soon as it is ready, then the "
+    "complete response.",
+    tags=["Query"],
+)
+async def stream_query_endpoint(
+    request: QueryRequest,
+    service: QueryEngineService = Depends(get_query_engine_service),
+):
+    """
+    Endpoint to stream the results of a user's natural language query.
+    """
+
+    logger.info(f"Streaming query: {request.query}")
+
+    return StreamingResponse(
+        _ndjson_lines(service, request.query), media_type="application/x-ndjson"
+    )
@@ -1,9 +1,10 @@
 import logging
 
 from fastapi import APIRouter, HTTPException, status
+from fastapi.responses import ORJSONResponse
 
 from backend.schemas.schema import SchemaResponse
-from backend.services.schema_discovery import SchemaDiscoveryService
+from backend.services.schema_discovery import SCHEMA_SERVICE
 
 logger = logging.getLogger(__name__)
 
@@ -22,16 +23,15 @@ router = APIRouter()
 async def get_database_schema():
     """
     Endpoint to trigger the dynamic schema discovery process.
+    Results are cached for CACHE_TTL_SECONDS.
 
-    The database session is injected by the `get_db_session` dependency,
-    which also handles transaction management (commit/rollback) and cleanup.
+    Discovery only reads the database catalog, using its own connection
+    from the engine rather than a request-scoped session.
     """
     try:
         logger.info("GET /api/schema endpoint called.")
 
-        discovery_service = SchemaDiscoveryService()
-
-        schema_response = await discovery_service.analyze_database()
+        schema_response = await SCHEMA_SERVICE.get_cached_schema()
 
         # Error Case for empty database
         if not schema_response.tables:
@@ -44,7 +44,9 @@ async def get_database_schema():
 
         logger.info(f"Successfully discovered {schema_response.total_tables} tables.")
 
-        return schema_response
+        # Already a validated SchemaResponse; re-validating every table and
+        # column on the way out is the bulk of this endpoint's CPU cost
+        return ORJSONResponse(content=schema_response.model_dump(mode="json"))
 
     except HTTPException as http_exc:
         raise http_exc
@@ -3,18 +3,31 @@ import logging
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 
-from backend.core.config import settings
+from backend.core.config import get_settings
 
 logger = logging.getLogger(__name__)
 
 try:
     async_engine = create_async_engine(
-        str(settings.DATABASE_URL),
-        echo=settings.DATABASE_ECHO,
-        pool_size=settings.DATABASE_POOL_SIZE,
-        max_overflow=0,
+        str(get_settings().DATABASE_URL),
+        echo=get_settings().DATABASE_ECHO,
+        pool_size=get_settings().DATABASE_POOL_SIZE,
+        max_overflow=get_settings().DATABASE_MAX_OVERFLOW,
         pool_recycle=3600,
         pool_pre_ping=True,
+        connect_args={
+            # SQLAlchemy's per-connection cache of asyncpg prepared statements
+            "prepared_statement_cache_size": get_settings().DATABASE_STATEMENT_CACHE_SIZE,
+            # asyncpg's own statement cache, used for its internal queries
+            "statement_cache_size": get_settings().DATABASE_STATEMENT_CACHE_SIZE,
+            "server_settings": {
+                # JIT compilation only slows down the short generated queries
+                "jit": "off",
+                # Stop a runaway generated query from pinning a connection
+                "statement_timeout": str(get_settings().DATABASE_STATEMENT_TIMEOUT_MS),
+                "application_name": get_settings().PROJECT_NAME,
+            },
+        },
     )
 
     AsyncSessionFactory = async_sessionmaker(
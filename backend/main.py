@@ -1,13 +1,24 @@
+import asyncio
 import logging
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, HTTPException, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.sql import text
 
 from backend.api.routes import ingestion, query, schema
-from backend.core.config import settings
+from backend.core.config import get_settings
 from backend.db.sessions import AsyncSessionFactory
+from backend.services import query_engine
+from backend.services.document_processor import (
+    EMBEDDING_BATCHER,
+    INGESTION_FLUSHER,
+    QUERY_EMBEDDING_BATCHER,
+    get_embedding_model,
+    get_vector_collection,
+)
 
 logging.basicConfig(
     level=logging.INFO,
@@ -17,13 +28,40 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Loads the ML models and starts the background batching workers
+    before the server accepts traffic, and stops the workers on shutdown.
+    """
+    # Load in a worker thread so startup doesn't block the event loop
+    for load in (
+        get_embedding_model,
+        get_vector_collection,
+        query_engine.get_sql_model,
+        query_engine.get_query_classifier,
+        query_engine.get_qa_pipeline,
+    ):
+        await asyncio.to_thread(load)
+
+    EMBEDDING_BATCHER.start()
+    QUERY_EMBEDDING_BATCHER.start()
+    INGESTION_FLUSHER.start()
+    yield
+    await INGESTION_FLUSHER.stop()
+    await QUERY_EMBEDDING_BATCHER.stop()
+    await EMBEDDING_BATCHER.stop()
+
+
 app = FastAPI(
-    title=settings.PROJECT_NAME,
+    title=get_settings().PROJECT_NAME,
     description="API for dynamic NLP query engine for employee data.",
     version="0.1.0",
     # Disable the /docs endpoint in a production environment
-    docs_url="/docs" if settings.DATABASE_ECHO else None,
-    redoc_url="/redoc" if settings.DATABASE_ECHO else None,
+    docs_url="/docs" if get_settings().DATABASE_ECHO else None,
+    redoc_url="/redoc" if get_settings().DATABASE_ECHO else None,
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 origins = [
@@ -55,7 +93,7 @@ def read_root():
     """
     A simple root endpoint to confirm the API is running.
     """
-    return {"status": "ok", "message": f"Welcome to {settings.PROJECT_NAME} API"}
+    return {"status": "ok", "message": f"Welcome to {get_settings().PROJECT_NAME} API"}
 
 
 @app.get("/api/health", tags=["Health"])
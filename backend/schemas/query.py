@@ -28,6 +28,10 @@ class SQLResult(BaseModel):
     generated_query: str = Field(
         ..., description="The exact SQL query that was executed."
     )
+    truncated: bool = Field(
+        default=False,
+        description="Whether rows past the SQL_MAX_ROWS limit were dropped.",
+    )
 
 
 class DocumentResult(BaseModel):
@@ -0,0 +1,131 @@
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+from typing import Generic, List, Tuple, TypeVar
+
+logger = logging.getLogger(__name__)
+
+ItemT = TypeVar("ItemT")
+ResultT = TypeVar("ResultT")
+
+
+class MicroBatcher(ABC, Generic[ItemT, ResultT]):
+    """
+    Coalesces work submitted by concurrent requests into a single batch
+    which is processed by one background worker task.
+
+    A batch is flushed as soon as `max_batch_size` units of work are queued,
+    or once `batch_timeout_ms` has elapsed since its first item arrived.
+    Subclasses implement `_process_batch` and, optionally, `_size_of`.
+    `_process_batch` may return an exception in place of a result to fail
+    a single item without failing the rest of its batch.
+    """
+
+    def __init__(self, name: str, max_batch_size: int, batch_timeout_ms: int):
+        self.name = name
+        self.max_batch_size = max_batch_size
+        self.batch_timeout = batch_timeout_ms / 1000
+        self._queue: asyncio.Queue[Tuple[ItemT, asyncio.Future[ResultT]]] = (
+            asyncio.Queue()
+        )
+        self._worker: asyncio.Task | None = None
+
+    def start(self) -> None:
+        """Starts the background worker if it is not already running."""
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run(), name=f"{self.name}-worker")
+            logger.info(
+                f"Started {self.name} worker (max batch: {self.max_batch_size}, "
+                f"timeout: {self.batch_timeout * 1000:.0f} ms)."
+            )
+
+    async def stop(self) -> None:
+        """Cancels the background worker and any work still waiting on it."""
+        if self._worker is None:
+            return
+
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+
+        while not self._queue.empty():
+            _, future = self._queue.get_nowait()
+            future.cancel()
+
+        logger.info(f"Stopped {self.name} worker.")
+
+    async def submit(self, item: ItemT) -> ResultT:
+        """Queues an item for the next batch and waits for its result."""
+        self.start()
+        future: asyncio.Future[ResultT] = asyncio.get_running_loop().create_future()
+        await self._queue.put((item, future))
+        return await future
+
+    def _size_of(self, item: ItemT) -> int:
+        """Units of work an item contributes towards `max_batch_size`."""
+        return 1
+
+    @abstractmethod
+    async def _process_batch(self, items: List[ItemT]) -> List[ResultT | Exception]:
+        """Processes a batch, returning one result (or exception) per item."""
+
+    async def _collect_batch(
+        self, batch: List[Tuple[ItemT, asyncio.Future[ResultT]]]
+    ) -> None:
+        """Waits for a first item, then drains the queue until full or timed out."""
+        loop = asyncio.get_running_loop()
+
+        batch.append(await self._queue.get())
+        size = self._size_of(batch[0][0])
+        deadline = loop.time() + self.batch_timeout
+
+        while size < self.max_batch_size:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+
+            try:
+                entry = await asyncio.wait_for(self._queue.get(), remaining)
+            except TimeoutError:
+                break
+
+            batch.append(entry)
+            size += self._size_of(entry[0])
+
+    async def _run(self) -> None:
+        while True:
+            batch: List[Tuple[ItemT, asyncio.Future[ResultT]]] = []
+
+            try:
+                await self._collect_batch(batch)
+                pending = [(item, fut) for item, fut in batch if not fut.done()]
+                if not pending:
+                    continue
+
+                results = await self._process_batch([item for item, _ in pending])
+
+            except asyncio.CancelledError:
+                for _, future in batch:
+                    future.cancel()
+                raise
+
+            except Exception as e:
+                logger.error(
+                    f"{self.name} failed to process a batch of {len(batch)}: {e}",
+                    exc_info=True,
+                )
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            for (_, future), result in zip(pending, results):
+                if future.done():
+                    continue
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
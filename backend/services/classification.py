@@ -0,0 +1,48 @@
+import logging
+
+from transformers import AutoTokenizer, Pipeline, pipeline
+
+from backend.core.config import get_settings
+from backend.services.onnx_export import (
+    export_quantized_model,
+    load_with_onnx_fallback,
+    quantized_file_name,
+)
+
+logger = logging.getLogger(__name__)
+
+CLASSIFIER_MODEL_NAME = "MoritzLaurer/DeBERTa-v3-base-mnli-fever-anli"
+
+
+def _load_onnx_classifier() -> Pipeline:
+    """
+    Loads the zero-shot classifier on ONNX Runtime with int8 weights,
+    exporting and quantizing the model on first use.
+    """
+    from optimum.onnxruntime import ORTModelForSequenceClassification
+
+    model_dir = export_quantized_model(
+        ORTModelForSequenceClassification, CLASSIFIER_MODEL_NAME
+    )
+    model = ORTModelForSequenceClassification.from_pretrained(
+        model_dir, file_name=quantized_file_name(), provider="CPUExecutionProvider"
+    )
+    return pipeline(
+        "zero-shot-classification",
+        model=model,
+        tokenizer=AutoTokenizer.from_pretrained(model_dir),
+    )
+
+
+def load_query_classifier() -> Pipeline:
+    """
+    Loads the zero-shot query classifier for the configured
+    CLASSIFIER_BACKEND, falling back to PyTorch when ONNX Runtime support
+    is not installed.
+    """
+    return load_with_onnx_fallback(
+        get_settings().CLASSIFIER_BACKEND == "onnx",
+        _load_onnx_classifier,
+        lambda: pipeline("zero-shot-classification", model=CLASSIFIER_MODEL_NAME),
+        "query classifier",
+    )
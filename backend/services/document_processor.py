@@ -1,240 +1,474 @@
 import asyncio
+import codecs
+import hashlib
 import logging
 import re
+from functools import lru_cache
 from pathlib import Path
-from typing import IO, List
+from typing import IO, Any, Callable, Dict, Iterable, Iterator, List, Set, Tuple
 
 import chromadb
 import docx
+import numpy as np
 import pypdf
+from chromadb.api.models.Collection import Collection
 from chromadb.config import Settings
 from fastapi import UploadFile
-from sentence_transformers import SentenceTransformer
 
-from backend.core.config import settings
+from backend.core.config import get_settings
+from backend.services.batching import MicroBatcher
+from backend.services.embeddings import EmbeddingModel, load_embedding_model
 
 logger = logging.getLogger(__name__)
 
 DB_PATH = Path(__file__).resolve().parent.parent / "vectordb"
 DB_PATH.mkdir(exist_ok=True)
 
+READ_BLOCK_SIZE = 64 * 1024
+MAX_CHUNK_CHARS = 1000  # Example limit, tune as needed
+_SECTION_RE = re.compile(r"(\n(?:[A-Z][a-zA-Z]+(?: [A-Z][a-zA-Z]+)*):?\s*\n)")
+_PARA_RE = re.compile(r"\n\s*\n+")
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
 
-try:
-    logger.info(f"Loading embedding model: {settings.EMBEDDING_MODEL}")
-    EMBEDDING_MODEL = SentenceTransformer(settings.EMBEDDING_MODEL)
-    logger.info("Embedding model loaded successfully.")
 
-    CHROMA_CLIENT = chromadb.Client(
-        Settings(
-            persist_directory=str(DB_PATH),
-            is_persistent=True,
-            anonymized_telemetry=False,
+@lru_cache(None)
+def get_embedding_model() -> EmbeddingModel:
+    """
+    Loads the embedding model on first use and returns the same instance
+    afterwards. Preloaded by the app lifespan before serving traffic.
+    """
+    try:
+        logger.info(f"Loading embedding model: {get_settings().EMBEDDING_MODEL}")
+        model = load_embedding_model(get_settings().EMBEDDING_MODEL)
+        logger.info("Embedding model loaded successfully.")
+        return model
+
+    except Exception as e:
+        logger.critical(f"Failed to initialize embedding model: {e}", exc_info=True)
+        raise RuntimeError("Could not initialize document processing")
+
+
+@lru_cache(None)
+def get_vector_collection() -> Collection:
+    """Opens the persistent ChromaDB collection on first use."""
+    try:
+        chroma_client = chromadb.Client(
+            Settings(
+                persist_directory=str(DB_PATH),
+                is_persistent=True,
+                anonymized_telemetry=False,
+            )
         )
-    )
 
-    VECTOR_COLLECTION = CHROMA_CLIENT.get_or_create_collection(
-        name="employee_documents"
-    )
-    logger.info(f"ChromaDB collection initialized at: {DB_PATH}")
+        collection = chroma_client.get_or_create_collection(name="employee_documents")
+        logger.info(f"ChromaDB collection initialized at: {DB_PATH}")
+        return collection
 
-except Exception as e:
-    logger.critical(f"Failed to initialize ML model or vector DB: {e}", exc_info=True)
-    raise RuntimeError("Could not initialize DocumentProcessorService")
+    except Exception as e:
+        logger.critical(f"Failed to initialize vector DB: {e}", exc_info=True)
+        raise RuntimeError("Could not initialize document processing")
 
 
-class DocumentProcessorService:
+class EmbeddingBatcher(MicroBatcher[List[str], np.ndarray]):
     """
-    Handles the logic for processing, chunking, and embedding
-    uploaded documents.
+    Coalesces the chunk lists of concurrent requests into a single
+    `encode` call, handing each caller back its own slice of embeddings.
     """
 
-    def __init__(self):
-        """
-        Initializes the service. We just reference the pre-loaded
-        model and collection for speed.
-        """
-        self.model = EMBEDDING_MODEL
-        self.collection = VECTOR_COLLECTION
-
-    async def process_documents(
-        self, files: List[UploadFile]
-    ) -> tuple[int, int, list[str]]:
-        """
-        Main function to process a list of uploaded files.
-        Returns (num_docs_ingested, num_chunks_created, list_of_doc_ids)
-        """
-        all_chunks = []
-        all_metadatas = []
-        all_chunk_ids = []
-        files_processed = 0
-
-        for file in files:
-            if file.filename is None:
-                continue
+    def __init__(
+        self, name: str = "EmbeddingBatcher", max_batch_size: int | None = None
+    ):
+        super().__init__(
+            name=name,
+            max_batch_size=max_batch_size or get_settings().EMBEDDING_MAX_BATCH,
+            batch_timeout_ms=get_settings().EMBEDDING_BATCH_TIMEOUT_MS,
+        )
+
+    def _size_of(self, item: List[str]) -> int:
+        return len(item)
+
+    async def _process_batch(
+        self, items: List[List[str]]
+    ) -> List[np.ndarray | Exception]:
+        all_texts = [text for texts in items for text in texts]
+        logger.info(
+            f"Encoding {len(all_texts)} texts from {len(items)} coalesced requests..."
+        )
+
+        embeddings = await asyncio.to_thread(
+            get_embedding_model().encode,
+            all_texts,
+            batch_size=get_settings().EMBEDDING_BATCH_SIZE,
+            show_progress_bar=False,
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+        )
+        embeddings = embeddings.astype(np.float32, copy=False)
+
+        results: List[np.ndarray | Exception] = []
+        offset = 0
+        for texts in items:
+            results.append(embeddings[offset : offset + len(texts)])
+            offset += len(texts)
+
+        return results
+
+
+# (embeddings, documents, metadatas, ids) for one request's chunks
+IngestionBatch = Tuple[np.ndarray, List[str], List[Dict[str, Any]], List[str]]
 
-            logger.info(f"Processing file: {file.filename}")
-
-            try:
-                # 1. Extract Text
-                text_content = await self._extract_text_from_file(file)
-                if not text_content:
-                    logger.warning(f"Skipping empty file: {file.filename}")
-                    continue
-
-                # 2. Dynamic Chunking
-                chunks = self._dynamic_chunking(text_content, file.content_type)
-                if not chunks:
-                    logger.warning(f"No text chunks extracted from {file.filename}")
-                    continue
-
-                # 3. Prepare metadata and IDs for this file's chunks
-                chunk_ids = [f"{file.filename}_{i}" for i in range(len(chunks))]
-                metadatas = [
-                    {"source_file": file.filename, "chunk_index": i}
-                    for i in range(len(chunks))
-                ]
-
-                # 4. Add to our master lists
-                all_chunks.extend(chunks)
-                all_metadatas.extend(metadatas)
-                all_chunk_ids.extend(chunk_ids)
-                files_processed += 1
-
-            except Exception as e:
-                logger.error(
-                    f"Failed to process file {file.filename}: {e}", exc_info=True
-                )
 
-        # 5. Generate & Store Embeddings (if any files were successful)
-        if all_chunks:
-            logger.info(f"Generating embeddings for {len(all_chunks)} chunks...")
+class IngestionFlusher(MicroBatcher[IngestionBatch, int]):
+    """
+    Accumulates the chunks of concurrent requests and commits them to
+    the vector store in a single `collection.add` call, off the event loop.
+    Each request gets back the number of its chunks that were stored.
+    """
+
+    def __init__(self):
+        super().__init__(
+            name="IngestionFlusher",
+            max_batch_size=get_settings().CHROMA_BATCH_SIZE,
+            batch_timeout_ms=get_settings().CHROMA_FLUSH_TIMEOUT_MS,
+        )
 
-            embeddings = await asyncio.to_thread(
-                self.model.encode,
-                all_chunks,
-                batch_size=settings.EMBEDDING_BATCH_SIZE,
-                show_progress_bar=False,
+    def _size_of(self, item: IngestionBatch) -> int:
+        return len(item[3])
+
+    def _add(self, items: List[IngestionBatch]) -> List[int]:
+        collection = get_vector_collection()
+
+        # Chroma accepts ndarrays directly; .tolist() would box every float
+        embeddings = np.concatenate([emb for emb, _, _, _ in items])
+        documents = [doc for _, docs, _, _ in items for doc in docs]
+        metadatas = [meta for _, _, metas, _ in items for meta in metas]
+        ids = [id_ for _, _, _, ids in items for id_ in ids]
+
+        # Concurrent requests may carry the same new chunk, in this batch or
+        # one flushed since they checked the store, and Chroma rejects
+        # duplicate IDs within a single add. Each chunk is credited to the
+        # first request that stores it.
+        seen_ids: Set[str] = set(collection.get(ids=ids, include=[])["ids"])
+        keep = []
+        stored_counts = []
+        offset = 0
+        for _, _, _, item_ids in items:
+            stored = 0
+            for i, id_ in enumerate(item_ids, start=offset):
+                if id_ not in seen_ids:
+                    seen_ids.add(id_)
+                    keep.append(i)
+                    stored += 1
+
+            stored_counts.append(stored)
+            offset += len(item_ids)
+
+        if len(keep) < len(ids):
+            embeddings = embeddings[keep]
+            documents = [documents[i] for i in keep]
+            metadatas = [metadatas[i] for i in keep]
+            ids = [ids[i] for i in keep]
+
+        if ids:
+            collection.add(
+                embeddings=embeddings, documents=documents, metadatas=metadatas, ids=ids
             )
 
-            # 6. Store in ChromaDB in a single batch
-            self.collection.add(
-                embeddings=embeddings.tolist(),
-                documents=all_chunks,
-                metadatas=all_metadatas,
-                ids=all_chunk_ids,
+        return stored_counts
+
+    async def _process_batch(
+        self, items: List[IngestionBatch]
+    ) -> List[int | Exception]:
+        try:
+            stored_counts = await asyncio.to_thread(self._add, items)
+            logger.info(
+                f"Flushed {sum(stored_counts)} chunks from "
+                f"{len(items)} requests to the vector store."
             )
-            logger.info(f"Successfully added {len(all_chunks)} chunks to vector store.")
+            return stored_counts
 
-        return files_processed, len(all_chunks), all_chunk_ids
+        except Exception as e:
+            if len(items) == 1:
+                raise
 
-    async def _extract_text_from_file(self, file: UploadFile) -> str:
-        """Extracts raw text from an uploaded file."""
-        file_content = await file.read()
-        file_like_object = self._bytes_to_file_like(file_content)
+            # One bad request must not fail the others it was batched with
+            logger.warning(f"Batched flush failed ({e}). Retrying per request.")
+            results: List[int | Exception] = []
+            for item in items:
+                try:
+                    results.extend(await asyncio.to_thread(self._add, [item]))
+                except Exception as item_exc:
+                    results.append(item_exc)
 
-        text = ""
-        try:
-            if file.content_type == "application/pdf":
-                reader = pypdf.PdfReader(file_like_object)
-                for page in reader.pages:
-                    text += (page.extract_text() or "") + "\n"
-
-            elif file.content_type in [
-                "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-                "application/msword",
-            ]:
-                doc = docx.Document(file_like_object)
-                for para in doc.paragraphs:
-                    text += para.text + "\n"
-
-            elif file.content_type == "text/plain":
-                text = file_content.decode("utf-8")
+            return results
 
-            else:
-                logger.warning(
-                    f"Unsupported file type: {file.content_type} "
-                    f"for file {file.filename}. Trying plain text."
-                )
-                text = file_content.decode("utf-8", errors="ignore")
 
-        except Exception as e:
+EMBEDDING_BATCHER = EmbeddingBatcher()
+# Kept apart from ingestion so user queries never queue behind large uploads
+QUERY_EMBEDDING_BATCHER = EmbeddingBatcher(
+    name="QueryEmbeddingBatcher",
+    max_batch_size=get_settings().QUERY_EMBEDDING_MAX_BATCH,
+)
+INGESTION_FLUSHER = IngestionFlusher()
+
+# Incremented whenever new chunks are stored, so cached query results
+# can tell they were computed against an older vector store.
+_ingest_generation = 0
+
+
+def get_ingest_generation() -> int:
+    """Returns the current vector store generation."""
+    return _ingest_generation
+
+
+def _bump_ingest_generation() -> None:
+    global _ingest_generation
+    _ingest_generation += 1
+
+
+def _read_text(file_obj: IO[bytes], errors: str = "strict") -> str:
+    """Decodes a file as UTF-8, reading it in fixed-size blocks."""
+    decoder = codecs.getincrementaldecoder("utf-8")(errors=errors)
+
+    parts = []
+    while block := file_obj.read(READ_BLOCK_SIZE):
+        parts.append(decoder.decode(block))
+    parts.append(decoder.decode(b"", final=True))
+
+    return "".join(parts)
+
+
+def _extract_pdf(file_obj: IO[bytes]) -> List[str]:
+    """One text segment per PDF page."""
+    reader = pypdf.PdfReader(file_obj)
+    return [page.extract_text() or "" for page in reader.pages]
+
+
+def _extract_docx(file_obj: IO[bytes]) -> List[str]:
+    """All paragraphs of a Word document as a single text segment."""
+    doc = docx.Document(file_obj)
+    return ["\n".join(para.text for para in doc.paragraphs)]
+
+
+def _extract_txt(file_obj: IO[bytes]) -> List[str]:
+    """A UTF-8 text file as a single text segment."""
+    return [_read_text(file_obj)]
+
+
+def _extract_fallback_txt(file_obj: IO[bytes]) -> List[str]:
+    """Best-effort plain text for unsupported types; undecodable bytes are dropped."""
+    return [_read_text(file_obj, errors="ignore")]
+
+
+# Content type -> sync text extractor, each returning a list of text segments
+EXTRACTORS: Dict[str, Callable[[IO[bytes]], List[str]]] = {
+    "application/pdf": _extract_pdf,
+    "application/vnd.openxmlformats-officedocument.wordprocessingml.document": _extract_docx,
+    "application/msword": _extract_docx,
+    "text/plain": _extract_txt,
+}
+
+
+def _chunk_id(source_file: str | None, chunk: str) -> str:
+    """
+    Stable ID derived from a chunk's source file and content, so re-ingests
+    are detected while identical chunks of different files keep their own
+    provenance.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{source_file}\0".encode("utf-8"))
+    digest.update(chunk.encode("utf-8"))
+    return f"h_{digest.hexdigest()}"
+
+
+async def process_documents(files: List[UploadFile]) -> tuple[int, int, list[str]]:
+    """
+    Main function to process a list of uploaded files.
+    Returns (num_docs_ingested, num_chunks_created, list_of_doc_ids)
+    """
+    all_chunks = []
+    all_metadatas = []
+    all_chunk_ids = []
+    seen_ids: Set[str] = set()
+    files_processed = 0
+
+    # 1. Extract & chunk all files concurrently
+    results = await asyncio.gather(
+        *(_process_one(file) for file in files), return_exceptions=True
+    )
+
+    for file, chunks in zip(files, results):
+        if isinstance(chunks, BaseException):
             logger.error(
-                f"Failed to extract text from {file.filename}: {e}", exc_info=True
+                f"Failed to process file {file.filename}: {chunks}",
+                exc_info=chunks,
             )
-            return ""
+            continue
+
+        if not chunks:
+            continue
 
-        finally:
-            file_like_object.close()
+        # 2. Add each unique chunk of the file, IDed by its file and content
+        # hash, to our master lists. A chunk repeated within one file keeps
+        # the index of its first occurrence.
+        for i, chunk in enumerate(chunks):
+            chunk_id = _chunk_id(file.filename, chunk)
+            if chunk_id in seen_ids:
+                continue
+
+            seen_ids.add(chunk_id)
+            all_chunks.append(chunk)
+            all_metadatas.append({"source_file": file.filename, "chunk_index": i})
+            all_chunk_ids.append(chunk_id)
+
+        files_processed += 1
 
-        return text
+    if not all_chunks:
+        return files_processed, 0, all_chunk_ids
 
-    def _dynamic_chunking(self, content: str, content_type: str | None) -> List[str]:
-        """
-        Intelligently chunks text, prioritizing paragraphs and basic sections,
-        with optional size limits.
-        """
-        logger.debug(f"Chunking document of type {content_type}")
-        chunks = []
+    # 3. Skip chunks whose content is already in the vector store
+    existing = await asyncio.to_thread(
+        get_vector_collection().get, ids=all_chunk_ids, include=[]
+    )
+    existing_ids = set(existing["ids"])
+    new = [i for i, id_ in enumerate(all_chunk_ids) if id_ not in existing_ids]
 
-        potential_sections = re.split(
-            r"(\n(?:[A-Z][a-zA-Z]+(?: [A-Z][a-zA-Z]+)*):?\s*\n)", content
+    if existing_ids:
+        logger.info(
+            f"Skipping {len(all_chunk_ids) - len(new)} chunks already in the vector store."
         )
 
-        for section in potential_sections:
-            if not section or section.isspace():
-                continue
+    # 4. Generate & Store Embeddings for the new chunks only
+    stored = 0
+    if new:
+        new_chunks = [all_chunks[i] for i in new]
+        logger.info(f"Generating embeddings for {len(new_chunks)} chunks...")
+
+        embeddings = await EMBEDDING_BATCHER.submit(new_chunks)
+
+        # 5. Store in ChromaDB, batched with other in-flight requests
+        stored = await INGESTION_FLUSHER.submit(
+            (
+                embeddings,
+                new_chunks,
+                [all_metadatas[i] for i in new],
+                [all_chunk_ids[i] for i in new],
+            )
+        )
+        _bump_ingest_generation()
+        logger.info(f"Successfully added {stored} chunks to vector store.")
 
-            if (
-                re.match(
-                    r"^(?:[A-Z][a-zA-Z]+(?: [A-Z][a-zA-Z]+)*):?\s*$", section.strip()
-                )
-                and len(section.strip()) < 50
-            ):
-                pass  # Simple approach: treat header as part of the section split
-
-            paragraphs = section.split("\n\n")
-
-            for paragraph in paragraphs:
-                para_clean = paragraph.strip()
-                if not para_clean:
-                    continue
-
-                MAX_CHUNK_CHARS = 1000  # Example limit, tune as needed
-                if len(para_clean) > MAX_CHUNK_CHARS:
-                    logger.debug(
-                        f"Paragraph too long ({len(para_clean)} chars), splitting by sentences."
-                    )
-                    sentences = re.split(
-                        r"(?<=[.!?])\s+", para_clean
-                    )  # Split after ., !, ?
-                    current_sub_chunk = ""
-
-                    for sentence in sentences:
-                        sentence = sentence.strip()
-                        if not sentence:
-                            continue
-                        # If adding sentence exceeds limit (with buffer), start new sub-chunk
-                        if (
-                            len(current_sub_chunk) + len(sentence) + 1 > MAX_CHUNK_CHARS
-                            and current_sub_chunk
-                        ):
-                            chunks.append(current_sub_chunk)
-                            current_sub_chunk = sentence
-                        else:
-                            current_sub_chunk += (
-                                " " if current_sub_chunk else ""
-                            ) + sentence
-                    if current_sub_chunk:  # Add the last sub-chunk
-                        chunks.append(current_sub_chunk)
-                else:
-                    # Paragraph is within size limits, add it directly
-                    chunks.append(para_clean)
+    return files_processed, stored, all_chunk_ids
+
+
+async def _process_one(file: UploadFile) -> List[str]:
+    """Extracts and chunks a single file, returning its chunks."""
+    if file.filename is None:
+        return []
+
+    logger.info(f"Processing file: {file.filename}")
+
+    text_segments = await _extract_text_from_file(file)
+    if not any(text_segments):
+        logger.warning(f"Skipping empty file: {file.filename}")
+        return []
 
+    chunks = await asyncio.to_thread(
+        list, _dynamic_chunking(text_segments, file.content_type)
+    )
+    if not chunks:
+        logger.warning(f"No text chunks extracted from {file.filename}")
+    else:
         logger.info(f"Created {len(chunks)} chunks using dynamic chunking.")
-        return chunks
 
-    def _bytes_to_file_like(self, content: bytes) -> IO[bytes]:
-        """Utility to convert bytes to a file-like object for pypdf/docx."""
-        from io import BytesIO
+    return chunks
+
+
+async def _extract_text_from_file(file: UploadFile) -> List[str]:
+    """
+    Extracts raw text from an uploaded file, as a list of segments
+    (e.g. one per PDF page).
+    """
+    return await asyncio.to_thread(
+        _parse_file, file.file, file.content_type, file.filename
+    )
+
+
+def _parse_file(
+    file_obj: IO[bytes], content_type: str | None, filename: str | None
+) -> List[str]:
+    """
+    Synchronously parses an upload into text. Run in a worker thread.
+    Parsers read straight from the upload's spooled temporary file,
+    so large uploads are never copied into memory as a whole.
+    """
+    extractor = EXTRACTORS.get(content_type or "")
+    if extractor is None:
+        logger.warning(
+            f"Unsupported file type: {content_type} "
+            f"for file {filename}. Trying plain text."
+        )
+        extractor = _extract_fallback_txt
+
+    try:
+        file_obj.seek(0)
+        return extractor(file_obj)
 
-        return BytesIO(content)
+    except Exception as e:
+        logger.error(f"Failed to extract text from {filename}: {e}", exc_info=True)
+        return []
+
+
+def _dynamic_chunking(
+    segments: Iterable[str], content_type: str | None
+) -> Iterator[str]:
+    """
+    Intelligently chunks text, prioritizing paragraphs and basic sections,
+    with optional size limits. Chunks are yielded lazily, one text
+    segment at a time, so the document is never joined into one string.
+    """
+    logger.debug(f"Chunking document of type {content_type}")
+
+    for content in segments:
+        yield from _chunk_segment(content)
+
+
+def _chunk_segment(content: str) -> Iterator[str]:
+    """Chunks a single text segment (e.g. one PDF page)."""
+    potential_sections = _SECTION_RE.split(content)
+
+    for section in potential_sections:
+        if not section or section.isspace():
+            continue
+
+        # Headers are kept as their own section by the capturing split
+        paragraphs = [p for p in (s.strip() for s in _PARA_RE.split(section)) if p]
+
+        for para_clean in paragraphs:
+            if len(para_clean) > MAX_CHUNK_CHARS:
+                logger.debug(
+                    f"Paragraph too long ({len(para_clean)} chars), splitting by sentences."
+                )
+                sentences = _SENTENCE_RE.split(para_clean)  # Split after ., !, ?
+                current_sub_chunk = ""
+
+                for sentence in sentences:
+                    sentence = sentence.strip()
+                    if not sentence:
+                        continue
+                    # If adding sentence exceeds limit (with buffer), start new sub-chunk
+                    if (
+                        len(current_sub_chunk) + len(sentence) + 1 > MAX_CHUNK_CHARS
+                        and current_sub_chunk
+                    ):
+                        yield current_sub_chunk
+                        current_sub_chunk = sentence
+                    else:
+                        current_sub_chunk += (
+                            " " if current_sub_chunk else ""
+                        ) + sentence
+                if current_sub_chunk:  # Add the last sub-chunk
+                    yield current_sub_chunk
+            else:
+                # Paragraph is within size limits, add it directly
+                yield para_clean
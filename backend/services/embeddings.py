@@ -0,0 +1,92 @@
+import logging
+from typing import List
+
+import numpy as np
+import torch
+from sentence_transformers import SentenceTransformer
+
+from backend.core.config import get_settings
+from backend.services.onnx_export import (
+    export_quantized_model,
+    load_with_onnx_fallback,
+    quantized_file_name,
+)
+
+logger = logging.getLogger(__name__)
+
+MAX_SEQ_LENGTH = 256  # Matches the sentence-transformers MiniLM default
+
+
+class OnnxSentenceEncoder:
+    """
+    Int8-quantized ONNX Runtime port of a sentence-transformers model.
+    Implements the subset of `SentenceTransformer.encode` used by the app.
+    """
+
+    def __init__(self, model_name: str):
+        from optimum.onnxruntime import ORTModelForFeatureExtraction
+        from transformers import AutoTokenizer
+
+        model_dir = export_quantized_model(ORTModelForFeatureExtraction, model_name)
+
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+        self.model = ORTModelForFeatureExtraction.from_pretrained(
+            model_dir, file_name=quantized_file_name(), provider="CPUExecutionProvider"
+        )
+
+    def encode(
+        self,
+        sentences: List[str],
+        batch_size: int = 32,
+        show_progress_bar: bool = False,
+        convert_to_numpy: bool = True,
+        normalize_embeddings: bool = False,
+    ) -> np.ndarray:
+        """Mean-pooled float32 embeddings, one row per sentence."""
+        batches = []
+        for start in range(0, len(sentences), batch_size):
+            inputs = self.tokenizer(
+                sentences[start : start + batch_size],
+                padding=True,
+                truncation=True,
+                max_length=MAX_SEQ_LENGTH,
+                return_tensors="np",
+            )
+            token_embeddings = self.model(**inputs).last_hidden_state
+
+            mask = inputs["attention_mask"][..., np.newaxis].astype(np.float32)
+            pooled = (token_embeddings * mask).sum(axis=1) / np.clip(
+                mask.sum(axis=1), 1e-9, None
+            )
+            if normalize_embeddings:
+                norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+                pooled = pooled / np.clip(norms, 1e-12, None)
+
+            batches.append(pooled)
+
+        return np.concatenate(batches).astype(np.float32)
+
+
+EmbeddingModel = SentenceTransformer | OnnxSentenceEncoder
+
+
+def _load_torch_embedding_model(model_name: str) -> SentenceTransformer:
+    """Loads the sentence-transformers model, in half precision on GPU."""
+    model = SentenceTransformer(model_name)
+    if torch.cuda.is_available():
+        model.half()
+
+    return model
+
+
+def load_embedding_model(model_name: str) -> EmbeddingModel:
+    """
+    Loads the embedding model for the configured EMBEDDING_BACKEND,
+    falling back to PyTorch when ONNX Runtime support is not installed.
+    """
+    return load_with_onnx_fallback(
+        get_settings().EMBEDDING_BACKEND == "onnx",
+        lambda: OnnxSentenceEncoder(model_name),
+        lambda: _load_torch_embedding_model(model_name),
+        "embedding model",
+    )
@@ -0,0 +1,75 @@
+import logging
+from pathlib import Path
+from typing import Any, Callable, Sequence, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+ONNX_MODELS_PATH = Path(__file__).resolve().parent.parent / "onnx_models"
+ONNX_FILE_NAME = "model.onnx"
+
+
+def quantized_file_name(file_name: str = ONNX_FILE_NAME) -> str:
+    """Name ORTQuantizer gives the int8 copy of an exported ONNX file."""
+    return file_name.replace(".onnx", "_quantized.onnx")
+
+
+def export_quantized_model(
+    model_class: Any,
+    model_name: str,
+    file_names: Sequence[str] = (ONNX_FILE_NAME,),
+    **export_kwargs: Any,
+) -> Path:
+    """
+    Exports a Hugging Face model to ONNX with the given optimum ORTModel
+    class and quantizes each of its ONNX files to int8. Done once; later
+    startups find the artifacts on disk and return their directory.
+    """
+    from optimum.onnxruntime import ORTQuantizer
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig
+    from transformers import AutoTokenizer
+
+    model_dir = ONNX_MODELS_PATH / model_name.replace("/", "--")
+    if all((model_dir / quantized_file_name(f)).exists() for f in file_names):
+        return model_dir
+
+    logger.info(f"Exporting {model_name} to ONNX at: {model_dir}")
+    model = model_class.from_pretrained(
+        model_name, export=True, provider="CPUExecutionProvider", **export_kwargs
+    )
+    model.save_pretrained(model_dir)
+    AutoTokenizer.from_pretrained(model_name).save_pretrained(model_dir)
+
+    logger.info(f"Quantizing ONNX {model_name} to int8...")
+    quantization_config = AutoQuantizationConfig.avx512_vnni(
+        is_static=False, per_channel=False
+    )
+    for file_name in file_names:
+        quantizer = ORTQuantizer.from_pretrained(model_dir, file_name=file_name)
+        quantizer.quantize(save_dir=model_dir, quantization_config=quantization_config)
+
+    return model_dir
+
+
+def load_with_onnx_fallback(
+    use_onnx: bool,
+    load_onnx: Callable[[], T],
+    load_torch: Callable[[], T],
+    description: str,
+) -> T:
+    """
+    Loads a model on ONNX Runtime if `use_onnx`, falling back to PyTorch
+    when ONNX Runtime support is not installed.
+    """
+    if use_onnx:
+        try:
+            return load_onnx()
+
+        except ImportError:
+            logger.warning(
+                "optimum[onnxruntime] is not installed. "
+                f"Falling back to the PyTorch {description}."
+            )
+
+    return load_torch()
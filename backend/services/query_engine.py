@@ -1,57 +1,157 @@
 import asyncio
+import hashlib
 import logging
+import re
 import time
-from typing import Any, Dict, List, Literal, Tuple, cast
+from collections import OrderedDict
+from contextlib import aclosing
+from functools import lru_cache
+from typing import Any, AsyncIterator, Dict, List, Literal, Tuple, TypeVar, cast
 
+import numpy as np
+import torch
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.sql import text
-from transformers import T5ForConditionalGeneration, T5Tokenizer, pipeline
+from transformers import pipeline
 
-from backend.core.config import settings
+from backend.core.config import get_settings
 from backend.schemas.query import DocumentResult, QueryResponse, SQLResult
 from backend.schemas.schema import SchemaResponse
-from backend.services.document_processor import EMBEDDING_MODEL, VECTOR_COLLECTION
-from backend.services.schema_discovery import SchemaDiscoveryService
+from backend.services.classification import load_query_classifier
+from backend.services.document_processor import (
+    EMBEDDING_BATCHER,
+    QUERY_EMBEDDING_BATCHER,
+    get_ingest_generation,
+    get_vector_collection,
+)
+from backend.services.schema_discovery import SCHEMA_SERVICE
+from backend.services.text_to_sql import is_compiled_sql_model, load_sql_model
 
 logger = logging.getLogger(__name__)
 
-try:
-    logger.info("Loading Text-to-SQL model...")
-
-    SQL_MODEL_NAME = "gaussalgo/T5-LM-Large-text2sql-spider"
-    SQL_TOKENIZER = T5Tokenizer.from_pretrained(SQL_MODEL_NAME)
-    SQL_MODEL = T5ForConditionalGeneration.from_pretrained(SQL_MODEL_NAME)
-
-    logger.info("Text-to-SQL model loaded.")
-    logger.info("Loading Query Classification model...")
-
-    CLASSIFIER_MODEL_NAME = "MoritzLaurer/DeBERTa-v3-base-mnli-fever-anli"
-    CLASSIFIER = pipeline(
-        "zero-shot-classification",
-        model=CLASSIFIER_MODEL_NAME,
-    )
-    logger.info("Query Classification model loaded.")
-
-    logger.info("Loading Question Answering model...")
-    QA_MODEL_NAME = "deepset/roberta-base-squad2"
-    QA_PIPELINE = pipeline(
-        "question-answering",
-        model=QA_MODEL_NAME,
-        tokenizer=QA_MODEL_NAME,
-    )
-    logger.info("Question Answering model loaded.")
-
-except Exception as e:
-    logger.critical(f"Failed to load local ML models: {e}", exc_info=True)
-    raise RuntimeError(f"Could not initialize QueryEngineService: {e}")
-
-QUERY_CACHE: Dict[str, Tuple[float, QueryResponse]] = {}
-CACHE_TTL = settings.CACHE_TTL_SECONDS
-CACHE_MAX_SIZE = settings.CACHE_MAX_SIZE
-logger.info(
-    f"Global query cache initialized with TTL: {CACHE_TTL} seconds, Max Size: {CACHE_MAX_SIZE}."
+T = TypeVar("T")
+
+# Streamed parts of a query: individual results, then the full response
+QueryPart = SQLResult | DocumentResult | QueryResponse
+
+QA_MODEL_NAME = "deepset/roberta-base-squad2"
+# Input and output token limit of the Text-to-SQL model
+SQL_MAX_LENGTH = 512
+
+
+@lru_cache(None)
+def get_sql_model() -> Tuple[Any, Any]:
+    """
+    Loads the Text-to-SQL tokenizer and model on first use.
+    Preloaded by the app lifespan before serving traffic.
+    """
+    try:
+        logger.info("Loading Text-to-SQL model...")
+        tokenizer_and_model = load_sql_model()
+        logger.info("Text-to-SQL model loaded.")
+        return tokenizer_and_model
+
+    except Exception as e:
+        logger.critical(f"Failed to load Text-to-SQL model: {e}", exc_info=True)
+        raise RuntimeError(f"Could not initialize QueryEngineService: {e}")
+
+
+@lru_cache(None)
+def get_query_classifier() -> Any:
+    """
+    Loads the zero-shot query classifier on first use.
+    Preloaded by the app lifespan before serving traffic.
+    """
+    try:
+        logger.info("Loading Query Classification model...")
+        classifier = load_query_classifier()
+        logger.info("Query Classification model loaded.")
+        return classifier
+
+    except Exception as e:
+        logger.critical(
+            f"Failed to load Query Classification model: {e}", exc_info=True
+        )
+        raise RuntimeError(f"Could not initialize QueryEngineService: {e}")
+
+
+@lru_cache(None)
+def get_qa_pipeline() -> Any:
+    """
+    Loads the Question Answering pipeline on first use.
+    Preloaded by the app lifespan before serving traffic.
+    """
+    try:
+        logger.info("Loading Question Answering model...")
+        qa_pipeline = pipeline(
+            "question-answering",
+            model=QA_MODEL_NAME,
+            tokenizer=QA_MODEL_NAME,
+        )
+        logger.info("Question Answering model loaded.")
+        return qa_pipeline
+
+    except Exception as e:
+        logger.critical(f"Failed to load Question Answering model: {e}", exc_info=True)
+        raise RuntimeError(f"Could not initialize QueryEngineService: {e}")
+
+
+# cache key -> (timestamp, TTL, ingest generation, response), least recently used first
+QUERY_CACHE: OrderedDict[str, Tuple[float, int, int, QueryResponse]] = OrderedDict()
+_QUERY_CACHE_LOCK = asyncio.Lock()
+# (timestamp, per-table prompts, table embeddings) of the database schema
+_SCHEMA_INDEX_CACHE: Tuple[float, List[str], np.ndarray] | None = None
+
+# Query openings that always mean a database query, matched in one pass.
+# Like str.startswith, so "top 5" also covers "top 50 employees"
+_SQL_PREFIXES = [
+    "list all",
+    "show me",
+    "how many",
+    "average salary",
+    "find employees",
+    "who reports to",
+    "top 5",
+]
+# Matched as whole words, so "select *" and "count(*)" count but "country" doesn't
+_SQL_PREFIX_WORDS = ["select", "count"]
+_SQL_PREFIX_RE = re.compile(
+    r"^(?:"
+    + "|".join(map(re.escape, _SQL_PREFIXES))
+    + r"|(?:"
+    + "|".join(_SQL_PREFIX_WORDS)
+    + r")\b)"
 )
 
+# Lexical cues of intent; queries matching exactly one skip the ML classifier.
+# Both are limited to phrasing that is rare outside their kind of query, as
+# words like "where" or "total" show up in document questions, and nouns
+# like "contracts" or "resumes" can name tables and columns
+_SQL_INTENT_RE = re.compile(
+    r"\b(?:group by|order by|sorted by|count of|how many\b.*\bper)\b"
+)
+_DOC_INTENT_RE = re.compile(
+    r"\b(?:according to|handbooks?|"
+    r"(?:policy|policies|guidelines?) (?:says?|states?))\b"
+)
+
+
+def _normalize_query(query: str) -> str:
+    """Lowercases the query and collapses its whitespace."""
+    return " ".join(query.lower().split())
+
+
+def _cache_key(query: str) -> str:
+    """Fixed-size cache key shared by all spellings of a normalized query."""
+    return hashlib.blake2b(
+        _normalize_query(query).encode("utf-8"), digest_size=16
+    ).hexdigest()
+
+
+async def _to_list(items: AsyncIterator[T]) -> List[T]:
+    """Collects an async iterator, for callers that need all items at once."""
+    return [item async for item in items]
+
 
 class QueryEngineService:
     """
@@ -62,36 +162,62 @@ class QueryEngineService:
 
     def __init__(self, db: AsyncSession):
         self.db = db
-        # Initialize SchemaDiscoveryService without db, as it gets its own connection
-        self.schema_service = SchemaDiscoveryService()
-        self.vector_collection = VECTOR_COLLECTION
-        self.embedding_model = EMBEDDING_MODEL
+        # Schema discovery gets its own connection, so it doesn't need db
+        self.schema_service = SCHEMA_SERVICE
+        self.vector_collection = get_vector_collection()
 
     async def process_query(self, query: str) -> QueryResponse:
         """Main entry point for processing a user's query with caching."""
+        async with aclosing(self.stream_query(query)) as parts:
+            async for part in parts:
+                if isinstance(part, QueryResponse):
+                    return part
+
+        raise RuntimeError(f"No response was produced for query: '{query}'")
+
+    async def stream_query(self, query: str) -> AsyncIterator[QueryPart]:
+        """
+        Processes a query like `process_query`, but yields SQL and document
+        results as soon as each is ready, followed by the full QueryResponse.
+        On a cache hit, only the QueryResponse is yielded.
+        """
         start_time = time.perf_counter()
         current_time = time.time()
+        generation = get_ingest_generation()
         cache_status: Literal["hit", "miss"] = "miss"
+        key = _cache_key(query)
+        cached_response: QueryResponse | None = None
 
-        if query in QUERY_CACHE:
-            timestamp, cached_response = QUERY_CACHE[query]
+        async with _QUERY_CACHE_LOCK:
+            if key in QUERY_CACHE:
+                timestamp, ttl, cached_generation, response = QUERY_CACHE[key]
 
-            if current_time - timestamp < CACHE_TTL:
-                logger.info(f"Cache hit for query: '{query}'")
-                cached_response.performance_metrics["total_time_seconds"] = round(
-                    time.perf_counter() - start_time, 2
-                )
-                cached_response.cache_status = "hit"
-                return cached_response
+                if cached_generation != generation:
+                    logger.info(f"Documents ingested since caching query: '{query}'")
+                    QUERY_CACHE.pop(key, None)
 
-            else:
-                logger.info(f"Cache expired for query: '{query}'")
-                QUERY_CACHE.pop(query, None)
-        else:
-            logger.info(f"Cache miss for query: '{query}'")
+                elif current_time - timestamp < ttl:
+                    logger.info(f"Cache hit for query: '{query}'")
+                    QUERY_CACHE.move_to_end(key)
+                    cached_response = response
 
-        schema = await self.schema_service.analyze_database()
-        schema_prompt = self._create_schema_prompt(schema)
+                else:
+                    logger.info(f"Cache expired for query: '{query}'")
+                    QUERY_CACHE.pop(key, None)
+            else:
+                logger.info(f"Cache miss for query: '{query}'")
+
+        if cached_response is not None:
+            # Shallow copy; the cached response is shared by all hits
+            yield cached_response.model_copy(
+                update={
+                    "cache_status": "hit",
+                    "performance_metrics": {
+                        "total_time_seconds": round(time.perf_counter() - start_time, 2)
+                    },
+                }
+            )
+            return
 
         query_type = await self._classify_query(query)
         logger.info(f"Query classified as: {query_type}")
@@ -99,27 +225,12 @@ class QueryEngineService:
         sql_result: SQLResult | None = None
         doc_results: List[DocumentResult] = []
 
-        try:
-            if query_type == "sql":
-                sql_result = await self._execute_sql_query(query, schema_prompt)
-
-            elif query_type == "document":
-                doc_results = await self._execute_document_query(query)
-
-            elif query_type == "hybrid":
-                sql_task = asyncio.create_task(
-                    self._execute_sql_query(query, schema_prompt)
-                )
-                doc_task = asyncio.create_task(self._execute_document_query(query))
-                sql_result, doc_results = await asyncio.gather(sql_task, doc_task)
-
+        async for result in self._iter_results(query, query_type):
+            if isinstance(result, SQLResult):
+                sql_result = result
             else:
-                logger.warning("Unknown query type. Defaulting to document search.")
-                doc_results = await self._execute_document_query(query)
-
-        except Exception as e:
-            logger.error(f"Error during query execution: {e}", exc_info=True)
-            raise
+                doc_results.append(result)
+            yield result
 
         end_time = time.perf_counter()
 
@@ -131,21 +242,94 @@ class QueryEngineService:
             cache_status=cache_status,
         )
 
-        QUERY_CACHE[query] = (current_time, response)
-        logger.info(f"Stored result in cache for query: '{query}'")
-
-        if len(QUERY_CACHE) > CACHE_MAX_SIZE:
-            try:
-                oldest_query = min(QUERY_CACHE, key=lambda k: QUERY_CACHE[k][0])
-                del QUERY_CACHE[oldest_query]
+        # Failed generations may succeed after a schema refresh; retry soon
+        ttl = get_settings().CACHE_TTL_SECONDS
+        if sql_result is not None and (
+            sql_result.generated_query.startswith("BLOCKED")
+            or sql_result.columns == ["Error"]
+        ):
+            ttl = get_settings().CACHE_TTL_NEGATIVE_SECONDS
+
+        async with _QUERY_CACHE_LOCK:
+            QUERY_CACHE[key] = (current_time, ttl, generation, response)
+            QUERY_CACHE.move_to_end(key)
+            logger.info(f"Stored result in cache for query: '{query}'")
+
+            max_size = get_settings().CACHE_MAX_SIZE
+            if len(QUERY_CACHE) > max_size:
+                oldest_key, _ = QUERY_CACHE.popitem(last=False)
                 logger.info(
-                    f"Cache full ({len(QUERY_CACHE)}/{CACHE_MAX_SIZE}). Removed oldest entry for query: '{oldest_query}'"
+                    f"Cache full ({len(QUERY_CACHE)}/{max_size}). Removed least recently used entry: {oldest_key}"
                 )
 
-            except ValueError:
-                pass
+        yield response
 
-        return response
+    async def _iter_results(
+        self, query: str, query_type: str
+    ) -> AsyncIterator[SQLResult | DocumentResult]:
+        """
+        Runs the query against the sources for its type, yielding results
+        in the order they complete.
+        """
+        tasks: List[asyncio.Task] = []
+
+        try:
+            if query_type == "sql":
+                schema_prompt = await self._get_schema_prompt(query)
+                yield await self._execute_sql_query(query, schema_prompt)
+
+            elif query_type == "document":
+                async for doc_result in self._iter_document_results(query):
+                    yield doc_result
+
+            elif query_type == "hybrid":
+                query_embedding: np.ndarray | None = None
+                try:
+                    # Shared by table selection and document search
+                    query_embedding = await QUERY_EMBEDDING_BATCHER.submit([query])
+                    schema_prompt = await self._get_schema_prompt(
+                        query, query_embedding
+                    )
+                except Exception as e:
+                    # Still answer from the database, given every table
+                    logger.error(
+                        f"Error embedding hybrid query. Skipping document search: {e}",
+                        exc_info=True,
+                    )
+                    query_embedding = None
+                    schema = await self.schema_service.get_cached_schema()
+                    schema_prompt = "".join(self._create_table_prompts(schema))
+
+                tasks = [
+                    asyncio.create_task(self._execute_sql_query(query, schema_prompt))
+                ]
+                if query_embedding is not None:
+                    tasks.append(
+                        asyncio.create_task(
+                            self._execute_document_query(query, query_embedding)
+                        )
+                    )
+                for next_done in asyncio.as_completed(tasks):
+                    result = await next_done
+                    if isinstance(result, SQLResult):
+                        yield result
+                    else:
+                        for doc_result in result:
+                            yield doc_result
+
+            else:
+                logger.warning("Unknown query type. Defaulting to document search.")
+                async for doc_result in self._iter_document_results(query):
+                    yield doc_result
+
+        except Exception as e:
+            logger.error(f"Error during query execution: {e}", exc_info=True)
+            raise
+
+        finally:
+            # Don't leave work running if the consumer stopped early
+            for task in tasks:
+                task.cancel()
 
     async def _classify_query(
         self, query: str
@@ -154,29 +338,30 @@ class QueryEngineService:
         Classifies the query using rules first, then falls back to
         a local zero-shot ML model.
         """
-        query_lower = query.lower().strip()
-
-        sql_keywords = [
-            "list all",
-            "show me",
-            "select ",
-            "how many",
-            "average salary",
-            "count ",
-            "find employees",
-            "who reports to",
-            "top 5",
-        ]
-
-        for keyword in sql_keywords:
-            if query_lower.startswith(keyword):
-                logger.info(f"Classified as 'sql' based on rule: '{keyword}'")
-                return "sql"
-
-        logger.info("No rule matched. Using ML classifier...")
+        query_lower = _normalize_query(query)
+
+        prefix = _SQL_PREFIX_RE.match(query_lower)
+        if prefix:
+            logger.info(f"Classified as 'sql' based on rule: '{prefix[0]}'")
+            return "sql"
+
+        sql_intent = _SQL_INTENT_RE.search(query_lower)
+        doc_intent = _DOC_INTENT_RE.search(query_lower)
+
+        if sql_intent and not doc_intent:
+            logger.info(f"Classified as 'sql' based on rule: '{sql_intent[0]}'")
+            return "sql"
+
+        if doc_intent and not sql_intent:
+            logger.info(f"Classified as 'document' based on rule: '{doc_intent[0]}'")
+            return "document"
+
+        logger.info("Rules were ambiguous. Using ML classifier...")
         labels = ["database query", "document search"]
 
-        result = await asyncio.to_thread(CLASSIFIER, query, labels, multi_label=True)
+        result = await asyncio.to_thread(
+            get_query_classifier(), query, labels, multi_label=True
+        )
 
         result_dict = cast(Dict[str, Any], result)
         scores = dict(zip(result_dict["labels"], result_dict["scores"]))
@@ -200,20 +385,10 @@ class QueryEngineService:
     async def _execute_sql_query(self, query: str, schema_prompt: str) -> SQLResult:
         """Generates and executes a SQL query."""
 
-        prompt = f"Tables:\n{schema_prompt}\n\nQuery: {query}"
-
         try:
-            inputs = SQL_TOKENIZER(
-                prompt, return_tensors="pt", max_length=1024, truncation=True
-            )
-
-            model_device = next(SQL_MODEL.parameters()).device
-            generated_ids = await asyncio.to_thread(
-                SQL_MODEL.generate, **inputs.to(model_device), max_length=512
+            generated_sql = await asyncio.to_thread(
+                self._generate_sql, query, schema_prompt
             )
-            generated_sql = SQL_TOKENIZER.decode(
-                generated_ids[0], skip_special_tokens=True
-            ).strip()
 
         except Exception as e:
             logger.error(f"Error during SQL generation: {e}", exc_info=True)
@@ -234,10 +409,29 @@ class QueryEngineService:
             )
 
         try:
-            result = await self.db.execute(text(generated_sql))
-            columns = list(result.keys())
-            rows = [list(row) for row in result.fetchall()]
-            return SQLResult(columns=columns, rows=rows, generated_query=generated_sql)
+            max_rows = get_settings().SQL_MAX_ROWS
+
+            # Server-side cursor, so rows past the cap are never transferred
+            result = await self.db.stream(text(generated_sql))
+            try:
+                columns = list(result.keys())
+                rows = [tuple(row) for row in await result.fetchmany(max_rows + 1)]
+            finally:
+                await result.close()
+
+            truncated = len(rows) > max_rows
+            if truncated:
+                logger.warning(
+                    f"Generated SQL returned more than {max_rows} rows. Truncating."
+                )
+                rows = rows[:max_rows]
+
+            return SQLResult(
+                columns=columns,
+                rows=rows,
+                generated_query=generated_sql,
+                truncated=truncated,
+            )
 
         except Exception as e:
             logger.error(
@@ -249,23 +443,66 @@ class QueryEngineService:
                 generated_query=generated_sql,
             )
 
-    async def _execute_document_query(self, query: str) -> List[DocumentResult]:
+    def _generate_sql(self, query: str, schema_prompt: str) -> str:
+        """
+        Tokenizes, generates and decodes in one go. Run in a worker thread,
+        as all three steps block.
+        """
+        sql_tokenizer, sql_model = get_sql_model()
+
+        # Prompt is "Tables:\n{schema}\n\nQuery: {query}". Only the schema is
+        # truncated to fit, so the question at the end is never cut off
+        query_ids = sql_tokenizer(f"\n\nQuery: {query}").input_ids
+        schema_ids = sql_tokenizer(
+            f"Tables:\n{schema_prompt}", add_special_tokens=False
+        ).input_ids
+        schema_budget = max(SQL_MAX_LENGTH - len(query_ids), 0)
+        if len(schema_ids) > schema_budget:
+            logger.warning(
+                f"Schema prompt truncated from {len(schema_ids)} to {schema_budget} tokens."
+            )
+
+        inputs = sql_tokenizer.pad(
+            {"input_ids": [schema_ids[:schema_budget] + query_ids]},
+            # A compiled encoder is only reused for inputs of the same shape
+            padding="max_length" if is_compiled_sql_model(sql_model) else False,
+            max_length=SQL_MAX_LENGTH,
+            return_tensors="pt",
+        )
+        # inference_mode is thread-local, so it must be entered in the worker
+        with torch.inference_mode():
+            generated_ids = sql_model.generate(
+                **inputs.to(sql_model.device), max_length=SQL_MAX_LENGTH
+            )
+
+        return sql_tokenizer.decode(generated_ids[0], skip_special_tokens=True).strip()
+
+    async def _execute_document_query(
+        self, query: str, query_embedding: np.ndarray | None = None
+    ) -> List[DocumentResult]:
+        """Collects the document results for a query into a list."""
+        return await _to_list(self._iter_document_results(query, query_embedding))
+
+    async def _iter_document_results(
+        self, query: str, query_embedding: np.ndarray | None = None
+    ) -> AsyncIterator[DocumentResult]:
         """
         Performs vector search and then uses a QA model to extract an answer.
+        The query is embedded here unless the caller already did.
         """
         try:
-            query_embedding = await asyncio.to_thread(
-                self.embedding_model.encode, [query]
-            )
+            if query_embedding is None:
+                # Coalesced with the queries of concurrent requests
+                query_embedding = await QUERY_EMBEDDING_BATCHER.submit([query])
 
             results = self.vector_collection.query(
-                query_embeddings=query_embedding.tolist(),
+                query_embeddings=query_embedding,
                 n_results=1,
             )
 
             if not results or not results.get("ids") or not results["ids"][0]:
                 logger.info("No relevant document chunks found for QA.")
-                return []
+                return
 
             top_chunk_id = results["ids"][0][0]
             top_chunk_doc = (
@@ -288,14 +525,14 @@ class QueryEngineService:
                 logger.warning(
                     f"ChromaDB returned result with empty document content for ID {top_chunk_id}"
                 )
-                return []
+                return
 
             qa_input = {"question": query, "context": top_chunk_doc}
             logger.info(
                 f"Running QA model on context from {top_chunk_meta.get('source_file', 'unknown')}_{top_chunk_meta.get('chunk_index', 0)}"
             )
 
-            qa_result = await asyncio.to_thread(QA_PIPELINE, qa_input)
+            qa_result = await asyncio.to_thread(get_qa_pipeline(), qa_input)
 
             logger.info(
                 f"QA model result: score={qa_result.get('score', 0.0):.4f}, answer='{qa_result.get('answer', '')}'"
@@ -309,25 +546,75 @@ class QueryEngineService:
                     "Could not find a specific answer in the relevant document section."
                 )
 
-            doc_result = DocumentResult(
+            yield DocumentResult(
                 source_file=str(top_chunk_meta.get("source_file", "unknown")),
                 chunk_index=int(top_chunk_meta.get("chunk_index", 0)),
                 answer=extracted_answer,
                 similarity_score=float(top_chunk_dist),
                 # context=top_chunk_doc # Optional: include context
             )
-            return [doc_result]
 
         except Exception as e:
             logger.error(f"Error during document query and QA: {e}", exc_info=True)
-            return []
 
-    def _create_schema_prompt(self, schema: SchemaResponse) -> str:
-        """Converts your discovered schema into a simple text prompt for the LLM."""
-        prompt = ""
+    async def _get_schema_prompt(
+        self, query: str, query_embedding: np.ndarray | None = None
+    ) -> str:
+        """
+        Builds the schema prompt for SQL generation from the
+        SQL_SCHEMA_TOP_K tables most similar to the query, so large schemas
+        don't crowd the query out of the model's input. The query is only
+        embedded if there are more tables than that and the caller didn't.
+        """
+        table_prompts, table_embeddings = await self._get_schema_index()
+
+        top_k = get_settings().SQL_SCHEMA_TOP_K
+        if len(table_prompts) <= top_k:
+            return "".join(table_prompts)
+
+        if query_embedding is None:
+            query_embedding = await QUERY_EMBEDDING_BATCHER.submit([query])
+        # Embeddings are normalized, so the dot product is the cosine similarity
+        scores = table_embeddings @ query_embedding[0]
+        # Keep the schema's table order among the selected tables
+        top = np.sort(np.argpartition(-scores, top_k)[:top_k])
+
+        return "".join(table_prompts[i] for i in top)
+
+    async def _get_schema_index(self) -> Tuple[List[str], np.ndarray]:
+        """
+        Returns the rendered prompt and embedding of every table, computing
+        them at most once per CACHE_TTL_SECONDS.
+        """
+        global _SCHEMA_INDEX_CACHE
+
+        if _SCHEMA_INDEX_CACHE is not None:
+            timestamp, table_prompts, table_embeddings = _SCHEMA_INDEX_CACHE
+            if time.monotonic() - timestamp < get_settings().CACHE_TTL_SECONDS:
+                return table_prompts, table_embeddings
+
+        schema = await self.schema_service.get_cached_schema()
+        table_prompts = self._create_table_prompts(schema)
+
+        # Don't cache an empty database; tables may be created any moment
+        if not schema.tables:
+            return table_prompts, np.empty((0, 0), dtype=np.float32)
+
+        table_embeddings = await EMBEDDING_BATCHER.submit(
+            [
+                f"{table.name}: {', '.join(col.name for col in table.columns)}"
+                for table in schema.tables
+            ]
+        )
+        _SCHEMA_INDEX_CACHE = (time.monotonic(), table_prompts, table_embeddings)
+
+        return table_prompts, table_embeddings
+
+    def _create_table_prompts(self, schema: SchemaResponse) -> List[str]:
+        """Converts your discovered schema into simple text prompts for the LLM."""
+        parts = []
         for table in schema.tables:
-            prompt += f"Table {table.name}(\n"
-            col_strings = [f"  {col.name} ({col.type})" for col in table.columns]
-            prompt += ",\n".join(col_strings) + "\n)\n"
+            cols = ",\n".join(f"  {col.name} ({col.type})" for col in table.columns)
+            parts.append(f"Table {table.name}(\n{cols}\n)\n")
 
-        return prompt
+        return parts
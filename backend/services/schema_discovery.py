@@ -1,10 +1,13 @@
+import asyncio
 import logging
+import time
 from typing import Any, Dict, List, Set
 
 from sqlalchemy import inspect
 from sqlalchemy.engine import Connection
 from sqlalchemy.exc import SQLAlchemyError
 
+from backend.core.config import get_settings
 from backend.db.sessions import async_engine
 from backend.schemas.schema import (
     ColumnDetail,
@@ -16,6 +19,10 @@ from backend.schemas.schema import (
 
 logger = logging.getLogger(__name__)
 
+# Discovered schema of the configured database, keyed "value" and "ts"
+_SCHEMA_CACHE: Dict[str, Any] = {}
+_SCHEMA_CACHE_LOCK = asyncio.Lock()
+
 
 class SchemaDiscoveryService:
     """
@@ -26,27 +33,63 @@ class SchemaDiscoveryService:
         pass
 
     def _get_schema_details_sync(self, conn: Connection) -> List[Dict[str, Any]]:
-        """Synchronous helper function to perform inspection."""
+        """
+        Synchronous helper function to perform inspection. Each kind of
+        object is reflected for all tables at once, so the number of
+        catalog queries doesn't grow with the number of tables.
+        """
         logger.debug("Running synchronous schema inspection...")
         inspector = inspect(conn)
         table_names = inspector.get_table_names()
-        all_tables_data = []
 
+        # Keyed by (schema, table_name); schema is None for the default schema
+        columns = inspector.get_multi_columns()
+        pk_constraints = inspector.get_multi_pk_constraint()
+        fks = inspector.get_multi_foreign_keys()
+        constraints = inspector.get_multi_unique_constraints()
+        indexes = inspector.get_multi_indexes()
+
+        all_tables_data = []
         for table_name in table_names:
+            key = (None, table_name)
             all_tables_data.append(
                 {
                     "name": table_name,
-                    "columns": inspector.get_columns(table_name),
-                    "pk_constraint": inspector.get_pk_constraint(table_name),
-                    "fks": inspector.get_foreign_keys(table_name),
-                    "constraints": inspector.get_unique_constraints(table_name),
-                    "indexes": inspector.get_indexes(table_name),
+                    "columns": columns.get(key, []),
+                    "pk_constraint": pk_constraints.get(key, {}),
+                    "fks": fks.get(key, []),
+                    "constraints": constraints.get(key, []),
+                    "indexes": indexes.get(key, []),
                 }
             )
         logger.debug(f"Sync inspection found {len(all_tables_data)} tables.")
 
         return all_tables_data
 
+    async def get_cached_schema(self) -> SchemaResponse:
+        """
+        Returns the discovered schema, re-analyzing the database at most
+        once per CACHE_TTL_SECONDS. Concurrent callers share one analysis.
+        """
+        async with _SCHEMA_CACHE_LOCK:
+            cached = _SCHEMA_CACHE.get("value")
+            if (
+                cached is not None
+                and time.monotonic() - _SCHEMA_CACHE["ts"]
+                < get_settings().CACHE_TTL_SECONDS
+            ):
+                logger.info("Returning cached database schema.")
+                return cached
+
+            schema_response = await self.analyze_database()
+
+            # Don't cache an empty database; tables may be created any moment
+            if schema_response.tables:
+                _SCHEMA_CACHE["value"] = schema_response
+                _SCHEMA_CACHE["ts"] = time.monotonic()
+
+            return schema_response
+
     async def analyze_database(self) -> SchemaResponse:
         """Analyzes the database schema using a direct connection."""
         logger.info(
@@ -127,3 +170,7 @@ class SchemaDiscoveryService:
                 return f"{fk['referred_table']}.{fk['referred_columns'][0]}"
 
         return None
+
+
+# Stateless apart from the module-level cache, so shared by all requests
+SCHEMA_SERVICE = SchemaDiscoveryService()
@@ -0,0 +1,131 @@
+import logging
+from typing import Any, Tuple
+
+import torch
+from transformers import (
+    AutoTokenizer,
+    PreTrainedTokenizerBase,
+    T5ForConditionalGeneration,
+)
+
+from backend.core.config import get_settings
+from backend.services.onnx_export import (
+    export_quantized_model,
+    load_with_onnx_fallback,
+    quantized_file_name,
+)
+
+logger = logging.getLogger(__name__)
+
+SQL_MODEL_NAME = "gaussalgo/T5-LM-Large-text2sql-spider"
+
+# Encoder, first-step decoder and cached-step decoder, as exported by optimum
+ONNX_SQL_MODEL_FILES = (
+    "encoder_model.onnx",
+    "decoder_model.onnx",
+    "decoder_with_past_model.onnx",
+)
+
+
+def _load_onnx_sql_model() -> Tuple[PreTrainedTokenizerBase, Any]:
+    """
+    Loads the Text-to-SQL model into int8 ONNX Runtime sessions, exporting
+    and quantizing it on first use and reusing the artifacts on later
+    startups.
+    """
+    import onnxruntime as ort
+    from optimum.onnxruntime import ORTModelForSeq2SeqLM
+
+    model_dir = export_quantized_model(
+        ORTModelForSeq2SeqLM,
+        SQL_MODEL_NAME,
+        ONNX_SQL_MODEL_FILES,
+        use_cache=True,
+        use_merged=False,
+    )
+
+    session_options = ort.SessionOptions()
+    session_options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+
+    encoder_file, decoder_file, decoder_with_past_file = map(
+        quantized_file_name, ONNX_SQL_MODEL_FILES
+    )
+    model = ORTModelForSeq2SeqLM.from_pretrained(
+        model_dir,
+        use_cache=True,
+        use_merged=False,
+        encoder_file_name=encoder_file,
+        decoder_file_name=decoder_file,
+        decoder_with_past_file_name=decoder_with_past_file,
+        provider="CPUExecutionProvider",
+        session_options=session_options,
+    )
+    return AutoTokenizer.from_pretrained(model_dir, use_fast=True), model
+
+
+def _compile_torch_sql_model(model: T5ForConditionalGeneration) -> Any:
+    """
+    Swaps in BetterTransformer's fused attention where available and
+    compiles the encoder. Inputs must be padded to one fixed length, or
+    every new prompt length triggers a recompilation.
+    """
+    try:
+        from optimum.bettertransformer import BetterTransformer
+
+        model = BetterTransformer.transform(model)
+
+    except (ImportError, ValueError, NotImplementedError) as e:
+        logger.warning(f"BetterTransformer unavailable for Text-to-SQL model: {e}")
+
+    # The decoder sees a new sequence length at every step, so only the
+    # fixed-shape encoder pass is worth compiling
+    model.encoder = torch.compile(model.get_encoder(), dynamic=False)
+    return model
+
+
+def is_compiled_sql_model(model: Any) -> bool:
+    """
+    Whether the model's encoder was compiled by `_compile_torch_sql_model`,
+    in which case its inputs must be padded to one fixed length.
+    """
+    return isinstance(model, torch.nn.Module) and hasattr(
+        model.get_encoder(), "_orig_mod"
+    )
+
+
+def _load_torch_sql_model() -> Tuple[PreTrainedTokenizerBase, Any]:
+    """
+    Loads the Text-to-SQL model on PyTorch, on GPU if available, and
+    compiles it if SQL_MODEL_COMPILE is set.
+    """
+    tokenizer = AutoTokenizer.from_pretrained(SQL_MODEL_NAME, use_fast=True)
+    # bfloat16 rather than float16, which overflows in T5's activations
+    model = T5ForConditionalGeneration.from_pretrained(
+        SQL_MODEL_NAME,
+        torch_dtype=torch.bfloat16 if get_settings().SQL_MODEL_BF16 else None,
+    )
+    if torch.cuda.is_available():
+        model.to("cuda")
+
+    model.eval()
+    model.config.use_cache = True
+    model.generation_config.use_cache = True
+
+    if get_settings().SQL_MODEL_COMPILE:
+        model = _compile_torch_sql_model(model)
+
+    return tokenizer, model
+
+
+def load_sql_model() -> Tuple[PreTrainedTokenizerBase, Any]:
+    """
+    Loads the Text-to-SQL tokenizer and model for the configured
+    SQL_MODEL_BACKEND, falling back to PyTorch when ONNX Runtime support
+    is not installed. Both models expose the same `generate` API.
+    """
+    return load_with_onnx_fallback(
+        get_settings().SQL_MODEL_BACKEND == "onnx",
+        _load_onnx_sql_model,
+        _load_torch_sql_model,
+        "Text-to-SQL model",
+    )